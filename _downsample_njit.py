@@ -0,0 +1,45 @@
+"""차트 라인 트레이스 다운샘플링(LTTB)용 numba JIT 커널"""
+import numpy as np
+
+from _njit import njit
+
+
+@njit(cache=True)
+def _lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets 방식으로 남길 포인트 인덱스 선택"""
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[n_out - 1] = n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        # 다음 버킷의 평균점
+        avg_start = int(np.floor((i + 1) * every)) + 1
+        avg_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(avg_start, avg_end):
+            avg_x += x[j]
+            avg_y += y[j]
+        avg_x /= avg_end - avg_start
+        avg_y /= avg_end - avg_start
+
+        # 현재 버킷에서 삼각형 넓이가 가장 큰 포인트 선택
+        range_start = int(np.floor(i * every)) + 1
+        range_end = int(np.floor((i + 1) * every)) + 1
+        ax = x[a]
+        ay = y[a]
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                next_a = j
+        idx[i + 1] = next_a
+        a = next_a
+    return idx
@@ -0,0 +1,77 @@
+"""기술적 지표 계산용 numba JIT 커널"""
+import numpy as np
+
+from _njit import njit
+
+
+@njit(cache=True)
+def _rsi_from_averages(avg_gain, avg_loss):
+    """평균 상승폭/하락폭으로 RSI 값 계산"""
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else np.nan
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+@njit(cache=True)
+def _rsi_wilder(close, period=14):
+    """Wilder 지수평활 방식 RSI 계산 (한 번의 순회)"""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+
+    # 처음 period개 변화량의 단순 평균으로 초기값 설정
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            avg_gain += d
+        elif d < 0:
+            avg_loss -= d
+    avg_gain /= period
+    avg_loss /= period
+    out[period] = _rsi_from_averages(avg_gain, avg_loss)
+
+    # avg = ((period - 1) * prev + x) / period
+    for i in range(period + 1, n):
+        d = close[i] - close[i - 1]
+        g = d if d > 0 else 0.0
+        l = -d if d < 0 else 0.0
+        avg_gain = ((period - 1) * avg_gain + g) / period
+        avg_loss = ((period - 1) * avg_loss + l) / period
+        out[i] = _rsi_from_averages(avg_gain, avg_loss)
+    return out
+
+
+@njit(cache=True)
+def _macd(close, fast=12, slow=26, signal=9):
+    """MACD 선, 시그널 선, 히스토그램을 한 번의 순회로 계산"""
+    n = close.shape[0]
+    macd_arr = np.empty(n)
+    sig_arr = np.empty(n)
+    hist_arr = np.empty(n)
+    if n == 0:
+        return macd_arr, sig_arr, hist_arr
+
+    af = 2.0 / (fast + 1)
+    as_ = 2.0 / (slow + 1)
+    asg = 2.0 / (signal + 1)
+
+    # 첫 값으로 초기화 (pandas ewm(adjust=False)와 동일)
+    ef = close[0]
+    es = close[0]
+    sig = 0.0
+    for i in range(n):
+        if i > 0:
+            ef += af * (close[i] - ef)
+            es += as_ * (close[i] - es)
+        m = ef - es
+        if i > 0:
+            sig += asg * (m - sig)
+        else:
+            sig = m
+        macd_arr[i] = m
+        sig_arr[i] = sig
+        hist_arr[i] = m - sig
+    return macd_arr, sig_arr, hist_arr
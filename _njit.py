@@ -0,0 +1,12 @@
+"""numba njit 폴백 심 (numba가 없으면 순수 파이썬으로 동작)"""
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
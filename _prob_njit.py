@@ -0,0 +1,149 @@
+"""상승/하락 확률 계산용 numba JIT 커널"""
+import numpy as np
+
+from _njit import njit
+
+
+# 신호 배열 순서 및 지표별 가중치
+SIGNAL_NAMES = ('RSI', 'MACD', 'Stochastic', 'MA', 'OBV')
+INDICATOR_WEIGHTS = np.array([0.25, 0.25, 0.15, 0.20, 0.15])
+
+
+@njit(cache=True)
+def _score_signals(rsi, macd, sig, hist, prev_hist, k, d, close, ma5, ma20,
+                   obv_now, obv_lag, close_lag):
+    """최근 지표 값으로 지표별 상승 신호 점수(0-100) 계산"""
+    scores = np.full(5, 50.0)
+
+    # 1. RSI 신호 (30 이하: 강한 상승 신호, 70 이상: 강한 하락 신호)
+    if not np.isnan(rsi):
+        if rsi < 30:
+            scores[0] = 80.0  # 강한 상승 신호
+        elif rsi < 40:
+            scores[0] = 65.0  # 상승 신호
+        elif rsi < 50:
+            scores[0] = 55.0  # 약한 상승 신호
+        elif rsi < 60:
+            scores[0] = 45.0  # 약한 하락 신호
+        elif rsi < 70:
+            scores[0] = 35.0  # 하락 신호
+        else:
+            scores[0] = 20.0  # 강한 하락 신호
+
+    # 2. MACD 신호
+    if not np.isnan(macd) and not np.isnan(sig):
+        if macd > sig and hist > prev_hist:
+            scores[1] = 75.0  # 강한 상승 신호
+        elif macd > sig:
+            scores[1] = 60.0  # 상승 신호
+        elif macd < sig and hist < prev_hist:
+            scores[1] = 25.0  # 강한 하락 신호
+        elif macd < sig:
+            scores[1] = 40.0  # 하락 신호
+
+    # 3. 스토캐스틱 신호
+    if not np.isnan(k) and not np.isnan(d):
+        if k < 20 and k > d:
+            scores[2] = 75.0  # 강한 상승 신호
+        elif k < 30:
+            scores[2] = 60.0  # 상승 신호
+        elif k > 80 and k < d:
+            scores[2] = 25.0  # 강한 하락 신호
+        elif k > 70:
+            scores[2] = 40.0  # 하락 신호
+
+    # 4. 이동평균선 신호
+    if not np.isnan(ma5) and not np.isnan(ma20):
+        if close > ma5 and ma5 > ma20:
+            scores[3] = 70.0  # 강한 상승 신호
+        elif close > ma5:
+            scores[3] = 60.0  # 상승 신호
+        elif close < ma5 and ma5 < ma20:
+            scores[3] = 30.0  # 강한 하락 신호
+        elif close < ma5:
+            scores[3] = 40.0  # 하락 신호
+
+    # 5. OBV 신호 (거래량 추세), 비교 시점이 없으면 중립
+    if not np.isnan(obv_lag) and not np.isnan(close_lag):
+        obv_trend = obv_now - obv_lag
+        price_trend = close - close_lag
+        if obv_trend > 0 and price_trend > 0:
+            scores[4] = 70.0  # 상승 확인
+        elif obv_trend < 0 and price_trend < 0:
+            scores[4] = 30.0  # 하락 확인
+        elif obv_trend > 0 and price_trend < 0:
+            scores[4] = 45.0  # 약한 하락 (거래량은 증가)
+        else:
+            scores[4] = 55.0  # 약한 상승
+
+    return scores
+
+
+@njit(cache=True)
+def _volume_weight(volume):
+    """최근 5일 거래량 / 기간 평균 거래량 비율(0.5-2.0)의 평균"""
+    n = volume.shape[0]
+    if n == 0:
+        return 1.0
+    avg_volume = volume.mean()
+    start = max(0, n - 5)
+    total = 0.0
+    for i in range(start, n):
+        if avg_volume > 0:
+            w = volume[i] / avg_volume
+        elif volume[i] > 0:
+            w = 2.0
+        else:
+            w = 1.0
+        if np.isnan(w):
+            w = 1.0
+        total += min(2.0, max(0.5, w))
+    return total / (n - start)
+
+
+@njit(cache=True)
+def _calculate_probability(close, rsi, macd, macd_signal, macd_hist,
+                           stoch_k, stoch_d, ma5, ma20, obv, volume):
+    """최근 N일 지표 배열로 (상승 확률, 하락 확률, 신호 배열) 계산"""
+    n = close.shape[0]
+    last = n - 1
+    prev = n - 2 if n > 1 else last
+    if n > 1:
+        lag = n - min(5, n - 1)
+        obv_lag = obv[lag]
+        close_lag = close[lag]
+    else:
+        obv_lag = np.nan
+        close_lag = np.nan
+
+    scores = _score_signals(
+        rsi[last], macd[last], macd_signal[last], macd_hist[last],
+        macd_hist[prev], stoch_k[last], stoch_d[last], close[last],
+        ma5[last], ma20[last], obv[last], obv_lag, close_lag
+    )
+
+    # 거래량 가중 평균 계산 (거래량이 높은 날의 신호에 더 높은 가중치)
+    volume_weight = _volume_weight(volume)
+    weighted_sum = 0.0
+    total_weight = 0.0
+    for i in range(5):
+        adjusted_weight = INDICATOR_WEIGHTS[i] * volume_weight
+        weighted_sum += scores[i] * adjusted_weight
+        total_weight += adjusted_weight
+
+    final_score = weighted_sum / total_weight if total_weight > 0 else 50.0
+
+    # 확률로 변환 (0-100% 범위로 정규화)
+    up_probability = max(0.0, min(100.0, final_score))
+    down_probability = 100.0 - up_probability
+    return up_probability, down_probability, scores
+
+
+def _warm_up():
+    """첫 화면 렌더링 전에 JIT 컴파일을 끝내 두기 위한 더미 호출"""
+    dummy = np.linspace(1.0, 2.0, 20)
+    _calculate_probability(dummy, dummy, dummy, dummy, dummy, dummy,
+                           dummy, dummy, dummy, dummy, dummy)
+
+
+_warm_up()
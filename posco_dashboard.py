@@ -1,9 +1,25 @@
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+from pathlib import Path
+import codecs
+import io
+import os
+import tempfile
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from _downsample_njit import _lttb_indices
+from _indicators_njit import _macd, _rsi_wilder
+from _prob_njit import SIGNAL_NAMES, _calculate_probability
+
+# Plotly Figure JSON 직렬화에 orjson 사용
+pio.json.config.default_engine = 'orjson'
 
 # yfinance 모듈 확인 및 설치 안내
 try:
@@ -114,13 +130,127 @@ st.markdown("""
 st.markdown('<h1 class="main-header">📈 포스코 홀딩스 주가 대시보드</h1>', unsafe_allow_html=True)
 st.markdown("---")
 
+# 주가 데이터 디스크 캐시 경로 (종목별 Parquet 파일)
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+@st.cache_resource
+def get_cache_dir():
+    """캐시 디렉터리를 한 번만 생성하고 경로 반환"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    return CACHE_DIR
+
+def _to_index_timestamp(value, tz):
+    """날짜 값을 인덱스와 같은 시간대의 Timestamp로 변환"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None and tz is not None:
+        return ts.tz_localize(tz)
+    if ts.tzinfo is not None and tz is None:
+        return ts.tz_localize(None)
+    return ts
+
+def _cache_path(ticker):
+    """종목별 캐시 파일 경로 (캐시 디렉터리를 만들 수 없으면 None)"""
+    try:
+        return get_cache_dir() / f"{ticker}.parquet"
+    except OSError:
+        return None
+
+def _read_cache(cache_path):
+    """캐시 파일 읽기 (없거나 손상된 파일은 캐시 미스로 처리)"""
+    if cache_path is None or not cache_path.exists():
+        return None
+    try:
+        return pd.read_parquet(cache_path)
+    except Exception:
+        return None
+
+def _write_cache(df, cache_path):
+    """임시 파일에 쓴 뒤 교체해 다른 세션이 쓰다 만 파일을 읽지 않도록 저장"""
+    if cache_path is None:
+        return
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+        os.close(fd)
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # 캐시 저장 실패 시에도 조회 결과는 그대로 사용
+        if tmp_path is not None:
+            Path(tmp_path).unlink(missing_ok=True)
+
+def _cache_changed(df, cached):
+    """병합 결과가 캐시와 달라졌는지 확인 (행 수, 구간, 컬럼, 마지막 봉 값 비교)"""
+    if cached is None or cached.empty:
+        return True
+    if (len(df) != len(cached) or list(df.columns) != list(cached.columns)
+            or df.index[0] != cached.index[0] or df.index[-1] != cached.index[-1]):
+        return True
+    return not np.array_equal(df.iloc[-1].to_numpy(dtype=np.float64),
+                              cached.iloc[-1].to_numpy(dtype=np.float64),
+                              equal_nan=True)
+
+def _has_corporate_action(df):
+    """배당 또는 주식분할이 있는 봉이 포함되어 있는지 확인"""
+    return any(
+        (df[col].fillna(0) != 0).any()
+        for col in ('Dividends', 'Stock Splits') if col in df.columns
+    )
+
+# 종목 객체 재사용 (HTTP 세션과 쿠키를 재실행 간에 공유)
+@st.cache_resource
+def _get_ticker(symbol):
+    """yfinance Ticker 객체를 한 번만 생성"""
+    return yf.Ticker(symbol)
+
 # 데이터 로드 함수
 @st.cache_data(ttl=300)  # 5분마다 캐시 갱신
 def load_stock_data(ticker, start_date, end_date):
-    """주가 데이터를 가져오는 함수"""
+    """주가 데이터를 가져오는 함수 (디스크 캐시에 없는 구간만 새로 요청)"""
     try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(start=start_date, end=end_date)
+        stock = _get_ticker(ticker)
+        cache_path = _cache_path(ticker)
+        cached = _read_cache(cache_path)
+        
+        if cached is None or cached.empty:
+            df = stock.history(start=start_date, end=end_date)
+        else:
+            tz = cached.index.tz
+            start_ts = _to_index_timestamp(start_date, tz)
+            end_ts = _to_index_timestamp(end_date, tz)
+            first_cached, last_cached = cached.index[0], cached.index[-1]
+            frames = [cached]
+            
+            # 캐시 시작일 이전 구간 (영업일이 있을 때만 요청)
+            # 시작 시각이 자정이 아니면 그날 봉은 조회 범위 밖이므로 다음 날부터 비교
+            start_day = start_ts.ceil('D')
+            if start_day < first_cached and np.busday_count(start_day.date(), first_cached.date()) > 0:
+                frames.insert(0, stock.history(start=start_day, end=first_cached))
+            
+            # 마지막 캐시일부터 다시 받아 장중 미완성 봉도 갱신
+            if last_cached < end_ts:
+                recent = stock.history(start=last_cached.normalize(), end=end_ts)
+                frames.append(recent)
+                
+                # 새 봉에 배당/분할이 있으면 이전 수정주가가 모두 바뀌므로 캐시를 버리고 전체 재요청
+                if _has_corporate_action(recent[recent.index > last_cached]):
+                    frames = [stock.history(start=start_date, end=end_date)]
+            
+            frames = [f for f in frames if not f.empty]
+            if not frames:
+                return None
+            df = pd.concat(frames)
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+        
+        if df.empty:
+            return None
+        
+        if _cache_changed(df, cached):
+            _write_cache(df, cache_path)
+        
+        tz = df.index.tz
+        df = df[(df.index >= _to_index_timestamp(start_date, tz)) &
+                (df.index < _to_index_timestamp(end_date, tz))]
         if df.empty:
             return None
         return df
@@ -128,6 +258,147 @@ def load_stock_data(ticker, start_date, end_date):
         st.error(f"데이터를 가져오는 중 오류가 발생했습니다: {str(e)}")
         return None
 
+# 기술적 지표 계산 함수
+def calculate_rsi(prices, period=14):
+    """RSI (Relative Strength Index) 계산 (Wilder 평활)"""
+    return _rsi_wilder(prices, period)
+
+def calculate_macd(prices, fast=12, slow=26, signal=9):
+    """MACD (Moving Average Convergence Divergence) 계산"""
+    macd_line, signal_line, histogram = _macd(prices, fast, slow, signal)
+    return macd_line, signal_line, histogram
+
+# 스토캐스틱 오실레이터 계산
+def calculate_stochastic(high, low, close, k_period=14, d_period=3):
+    """스토캐스틱 오실레이터 계산"""
+    n = len(close)
+    k_percent = np.full(n, np.nan)
+    d_percent = np.full(n, np.nan)
+    if n < k_period:
+        return k_percent, d_percent
+    
+    # 복사 없는 슬라이딩 윈도우 뷰로 기간 내 최고가/최저가 계산
+    highest_high = sliding_window_view(high, k_period).max(axis=-1)
+    lowest_low = sliding_window_view(low, k_period).min(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k_percent[k_period - 1:] = 100 * ((close[k_period - 1:] - lowest_low) / (highest_high - lowest_low))
+    
+    if n >= k_period + d_period - 1:
+        d_percent[k_period + d_period - 2:] = sliding_window_view(k_percent[k_period - 1:], d_period).mean(axis=-1)
+    return k_percent, d_percent
+
+# 이동평균 기간 (5일/20일은 확률 계산의 이동평균 신호와 볼린저 밴드 중간선에 항상 필요)
+MA_WINDOWS = (5, 20, 60, 120)
+REQUIRED_MA_WINDOWS = (5, 20)
+
+def _moving_averages(close, ma_windows):
+    """누적합 한 번으로 여러 기간의 이동평균 계산"""
+    n = len(close)
+    cs = np.concatenate(([0.0], close.cumsum()))
+    columns = {}
+    for window in ma_windows:
+        ma = np.full(n, np.nan)
+        if n >= window:
+            ma[window - 1:] = (cs[window:] - cs[:-window]) / window
+        columns[f'MA_{window}'] = ma
+    return columns
+
+# 지표 계산 결과 캐시 (위젯 변경으로 인한 재실행 시 재계산 방지)
+@st.cache_data(ttl=300, show_spinner=False)
+def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """5일/20일 이동평균, RSI, MACD, 스토캐스틱, OBV, 볼린저 밴드 계산"""
+    df = df.sort_index()
+    close = df['Close'].to_numpy(dtype=np.float64)
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+    volume = df['Volume'].to_numpy(dtype=np.float64)
+    n = len(close)
+    columns = _moving_averages(close, REQUIRED_MA_WINDOWS)
+    
+    # 기술적 지표 계산
+    columns['RSI'] = calculate_rsi(close, period=14)
+    columns['MACD'], columns['MACD_Signal'], columns['MACD_Hist'] = calculate_macd(close)
+    columns['Stoch_K'], columns['Stoch_D'] = calculate_stochastic(high, low, close)
+    
+    # OBV (On-Balance Volume) 계산
+    step = np.sign(np.diff(close, prepend=close[:1])) * volume
+    columns['OBV'] = np.nan_to_num(step).cumsum()
+    
+    # 볼린저 밴드 계산 (중간선은 20일 이동평균 재사용)
+    std20 = np.full(n, np.nan)
+    if n >= 20:
+        std20[19:] = sliding_window_view(close, 20).std(axis=-1, ddof=1)
+    columns['BB_Middle'] = columns['MA_20']
+    columns['BB_Std'] = std20
+    columns['BB_Upper'] = columns['BB_Middle'] + (std20 * 2)
+    columns['BB_Lower'] = columns['BB_Middle'] - (std20 * 2)
+    
+    # 지표 컬럼은 numpy 배열로만 계산한 뒤 한 번에 붙임
+    return pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1)
+
+def add_moving_averages(df, ma_windows):
+    """df에 없는 기간의 이동평균 컬럼만 제자리에 추가 (프레임 전체 복사 없음)"""
+    missing = [w for w in ma_windows if f'MA_{w}' not in df.columns]
+    columns = _moving_averages(df['Close'].to_numpy(dtype=np.float64), missing)
+    for name, values in columns.items():
+        df[name] = values
+    return df
+
+# pandas 3부터는 copy-on-write로 rename이 데이터를 복사하지 않으며 copy 인자는 폐기 예정
+RENAME_NO_COPY = {'copy': False} if int(pd.__version__.split('.')[0]) < 3 else {}
+
+def build_table_frame(df):
+    """표/CSV용 프레임 생성 (모든 이동평균을 RSI 앞에 기간 순으로 배치해 한 번에 생성)"""
+    ma = {f'MA_{w}': df[f'MA_{w}'].to_numpy() for w in MA_WINDOWS if f'MA_{w}' in df.columns}
+    missing = [w for w in MA_WINDOWS if f'MA_{w}' not in ma]
+    ma.update(_moving_averages(df['Close'].to_numpy(dtype=np.float64), missing))
+    
+    data = {}
+    for col in df.columns:
+        if col == 'RSI':
+            data.update((f'MA_{w}', ma[f'MA_{w}']) for w in MA_WINDOWS)
+        if not col.startswith('MA_'):
+            data[col] = df[col].to_numpy()
+    return pd.DataFrame(data, index=df.index)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def compute_daily_returns(df: pd.DataFrame) -> pd.Series:
+    """일일 수익률(%) 계산"""
+    return df['Close'].pct_change().dropna() * 100
+
+@st.cache_data(ttl=300, show_spinner=False)
+def to_csv_bytes(df):
+    """날짜 인덱스를 첫 컬럼으로 한 UTF-8 BOM CSV 바이트 생성 (엑셀 한글 호환)"""
+    # 날짜는 df.to_csv와 같은 문자열(예: 2024-01-02 00:00:00+09:00)로 기록
+    table = pa.table({
+        df.index.name or 'Date': pa.array(df.index.astype(str)),
+        **{col: pa.array(df[col]) for col in df.columns}
+    })
+    buf = io.BytesIO()
+    buf.write(codecs.BOM_UTF8)
+    pacsv.write_csv(table, buf)
+    return buf.getvalue()
+
+# 차트 x축 값 (날짜 문자열 변환 대신 epoch 밀리초 정수 사용)
+def to_epoch_ms(index):
+    """DatetimeIndex를 현지 시각 기준 epoch 밀리초(int64) 배열로 변환"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[ms]').astype(np.int64)
+
+# 차트 라인 트레이스 다운샘플링 (브라우저 렌더링 부하 감소)
+MAX_LINE_POINTS = 800
+
+def downsample_line(x, y, max_points=MAX_LINE_POINTS):
+    """LTTB로 라인 트레이스 포인트 수를 max_points 이하로 축소"""
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~np.isnan(y)
+    x, y = x[valid], y[valid]
+    if len(y) <= max_points:
+        return x, y
+    idx = _lttb_indices(x.astype(np.float64), y, max_points)
+    return x[idx], y[idx]
+
 # 사이드바 설정
 st.sidebar.markdown("""
     <div style='background: rgba(255, 255, 255, 0.15); padding: 1rem; border-radius: 10px; margin-bottom: 1.5rem;'>
@@ -225,388 +496,321 @@ if df is None or df.empty:
     st.error("데이터를 불러올 수 없습니다. 인터넷 연결을 확인하거나 나중에 다시 시도해주세요.")
     st.stop()
 
-# 데이터 전처리
-df = df.sort_index()
-df['MA_5'] = df['Close'].rolling(window=5).mean()
-df['MA_20'] = df['Close'].rolling(window=20).mean()
-df['MA_60'] = df['Close'].rolling(window=60).mean()
-df['MA_120'] = df['Close'].rolling(window=120).mean()
+# 데이터 전처리 및 기술적 지표 계산 (60일/120일 이동평균은 선택했을 때만 추가)
+df = compute_indicators(df)  # st.cache_data가 매번 새 복사본을 돌려주므로 제자리 수정 가능
+df = add_moving_averages(df, ma_periods)
+x_vals = to_epoch_ms(df.index)
 
-# 기술적 지표 계산 함수
-def calculate_rsi(prices, period=14):
-    """RSI (Relative Strength Index) 계산"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+# 확률 계산에 쓰는 컬럼 (_calculate_probability 인자 순서)
+PROBABILITY_COLUMNS = ('Close', 'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist',
+                       'Stoch_K', 'Stoch_D', 'MA_5', 'MA_20', 'OBV', 'Volume')
 
-def calculate_macd(prices, fast=12, slow=26, signal=9):
-    """MACD (Moving Average Convergence Divergence) 계산"""
-    ema_fast = prices.ewm(span=fast, adjust=False).mean()
-    ema_slow = prices.ewm(span=slow, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    histogram = macd_line - signal_line
-    return macd_line, signal_line, histogram
-
-# 기술적 지표 계산
-df['RSI'] = calculate_rsi(df['Close'], period=14)
-df['MACD'], df['MACD_Signal'], df['MACD_Hist'] = calculate_macd(df['Close'])
-
-# 스토캐스틱 오실레이터 계산
-def calculate_stochastic(high, low, close, k_period=14, d_period=3):
-    """스토캐스틱 오실레이터 계산"""
-    lowest_low = low.rolling(window=k_period).min()
-    highest_high = high.rolling(window=k_period).max()
-    k_percent = 100 * ((close - lowest_low) / (highest_high - lowest_low))
-    d_percent = k_percent.rolling(window=d_period).mean()
-    return k_percent, d_percent
-
-df['Stoch_K'], df['Stoch_D'] = calculate_stochastic(df['High'], df['Low'], df['Close'])
-
-# OBV (On-Balance Volume) 계산
-df['OBV'] = (np.sign(df['Close'].diff()) * df['Volume']).fillna(0).cumsum()
+# 자주 쓰는 컬럼을 numpy 배열로 한 번만 추출
+arrays = {
+    col: df[col].to_numpy(dtype=np.float64)
+    for col in ('High', 'Low') + PROBABILITY_COLUMNS
+}
 
 # 상승/하락 확률 계산 함수
-def calculate_probability(df, lookback_period=20):
+def calculate_probability(arrays, lookback_period=20):
     """기술적 지표와 거래량을 기반으로 상승/하락 확률 계산"""
-    if len(df) < lookback_period:
-        lookback_period = len(df)
+    if len(arrays['Close']) < lookback_period:
+        lookback_period = len(arrays['Close'])
     
     # 최근 N일 데이터만 사용
-    recent_df = df.tail(lookback_period).copy()
-    
-    # 각 지표별 상승 신호 점수 계산 (0-100)
-    signals = {}
-    
-    # 1. RSI 신호 (30 이하: 강한 상승 신호, 70 이상: 강한 하락 신호)
-    latest_rsi = recent_df['RSI'].iloc[-1]
-    if pd.notna(latest_rsi):
-        if latest_rsi < 30:
-            signals['RSI'] = 80  # 강한 상승 신호
-        elif latest_rsi < 40:
-            signals['RSI'] = 65  # 상승 신호
-        elif latest_rsi < 50:
-            signals['RSI'] = 55  # 약한 상승 신호
-        elif latest_rsi < 60:
-            signals['RSI'] = 45  # 약한 하락 신호
-        elif latest_rsi < 70:
-            signals['RSI'] = 35  # 하락 신호
-        else:
-            signals['RSI'] = 20  # 강한 하락 신호
-    else:
-        signals['RSI'] = 50  # 중립
-    
-    # 2. MACD 신호
-    latest_macd = recent_df['MACD'].iloc[-1]
-    latest_signal = recent_df['MACD_Signal'].iloc[-1]
-    latest_hist = recent_df['MACD_Hist'].iloc[-1]
-    prev_hist = recent_df['MACD_Hist'].iloc[-2] if len(recent_df) > 1 else latest_hist
-    
-    if pd.notna(latest_macd) and pd.notna(latest_signal):
-        if latest_macd > latest_signal and latest_hist > prev_hist:
-            signals['MACD'] = 75  # 강한 상승 신호
-        elif latest_macd > latest_signal:
-            signals['MACD'] = 60  # 상승 신호
-        elif latest_macd < latest_signal and latest_hist < prev_hist:
-            signals['MACD'] = 25  # 강한 하락 신호
-        elif latest_macd < latest_signal:
-            signals['MACD'] = 40  # 하락 신호
-        else:
-            signals['MACD'] = 50  # 중립
-    else:
-        signals['MACD'] = 50
-    
-    # 3. 스토캐스틱 신호
-    latest_stoch_k = recent_df['Stoch_K'].iloc[-1]
-    latest_stoch_d = recent_df['Stoch_D'].iloc[-1]
-    if pd.notna(latest_stoch_k) and pd.notna(latest_stoch_d):
-        if latest_stoch_k < 20 and latest_stoch_k > latest_stoch_d:
-            signals['Stochastic'] = 75  # 강한 상승 신호
-        elif latest_stoch_k < 30:
-            signals['Stochastic'] = 60  # 상승 신호
-        elif latest_stoch_k > 80 and latest_stoch_k < latest_stoch_d:
-            signals['Stochastic'] = 25  # 강한 하락 신호
-        elif latest_stoch_k > 70:
-            signals['Stochastic'] = 40  # 하락 신호
-        else:
-            signals['Stochastic'] = 50  # 중립
-    else:
-        signals['Stochastic'] = 50
-    
-    # 4. 이동평균선 신호
-    latest_price = recent_df['Close'].iloc[-1]
-    ma5 = recent_df['MA_5'].iloc[-1] if 'MA_5' in recent_df.columns else None
-    ma20 = recent_df['MA_20'].iloc[-1] if 'MA_20' in recent_df.columns else None
-    
-    ma_score = 50
-    if pd.notna(ma5) and pd.notna(ma20):
-        if latest_price > ma5 > ma20:
-            ma_score = 70  # 강한 상승 신호
-        elif latest_price > ma5:
-            ma_score = 60  # 상승 신호
-        elif latest_price < ma5 < ma20:
-            ma_score = 30  # 강한 하락 신호
-        elif latest_price < ma5:
-            ma_score = 40  # 하락 신호
-    
-    signals['MA'] = ma_score
-    
-    # 5. OBV 신호 (거래량 추세)
-    if len(recent_df) > 1:
-        obv_trend = recent_df['OBV'].iloc[-1] - recent_df['OBV'].iloc[-min(5, len(recent_df)-1)]
-        price_trend = recent_df['Close'].iloc[-1] - recent_df['Close'].iloc[-min(5, len(recent_df)-1)]
-        
-        if obv_trend > 0 and price_trend > 0:
-            signals['OBV'] = 70  # 상승 확인
-        elif obv_trend < 0 and price_trend < 0:
-            signals['OBV'] = 30  # 하락 확인
-        elif obv_trend > 0 and price_trend < 0:
-            signals['OBV'] = 45  # 약한 하락 (거래량은 증가)
-        else:
-            signals['OBV'] = 55  # 약한 상승
-    else:
-        signals['OBV'] = 50
-    
-    # 거래량 가중치 계산 (최근 거래량이 평균보다 높을수록 가중치 증가)
-    recent_volumes = recent_df['Volume'].tail(5)
-    avg_volume = recent_df['Volume'].mean()
-    volume_weights = (recent_volumes / avg_volume).fillna(1.0).clip(0.5, 2.0).values
-    
-    # 각 지표별 가중치 (거래량이 높은 날의 신호에 더 높은 가중치)
-    indicator_weights = {
-        'RSI': 0.25,
-        'MACD': 0.25,
-        'Stochastic': 0.15,
-        'MA': 0.20,
-        'OBV': 0.15
-    }
-    
-    # 거래량 가중 평균 계산
-    weighted_scores = []
-    total_weight = 0
-    
-    for indicator, base_weight in indicator_weights.items():
-        if indicator in signals:
-            # 최근 5일의 거래량 가중치 평균 적용
-            volume_weight = np.mean(volume_weights) if len(volume_weights) > 0 else 1.0
-            adjusted_weight = base_weight * volume_weight
-            weighted_scores.append(signals[indicator] * adjusted_weight)
-            total_weight += adjusted_weight
-    
-    if total_weight > 0:
-        final_score = sum(weighted_scores) / total_weight
-    else:
-        final_score = 50
+    recent = [arrays[col][-lookback_period:] for col in PROBABILITY_COLUMNS]
     
-    # 확률로 변환 (0-100% 범위로 정규화)
-    up_probability = max(0, min(100, final_score))
-    down_probability = 100 - up_probability
+    up_probability, down_probability, scores = _calculate_probability(*recent)
+    signals = dict(zip(SIGNAL_NAMES, scores.tolist()))
     
     return up_probability, down_probability, signals
 
 # 상승/하락 확률 계산
-up_prob, down_prob, indicator_signals = calculate_probability(df, lookback_period=20)
+up_prob, down_prob, indicator_signals = calculate_probability(arrays, lookback_period=20)
 
-# 현재가 및 주요 지표 계산
-latest_price = df['Close'].iloc[-1]
-previous_price = df['Close'].iloc[-2] if len(df) > 1 else latest_price
+# 주요 통계 계산 (KPI 지표와 통계 요약 표에서 함께 사용)
+close = arrays['Close']
+latest_price = close[-1]
+previous_price = close[-2] if len(close) > 1 else latest_price
 price_change = latest_price - previous_price
-price_change_pct = (price_change / previous_price * 100) if previous_price != 0 else 0
-
-# 추가 통계
-max_price = df['High'].max()
-min_price = df['Low'].min()
-avg_volume = df['Volume'].mean()
-latest_volume = df['Volume'].iloc[-1]
-
-# 메인 대시보드
-# KPI 지표
-st.subheader("📊 주요 지표")
-col1, col2, col3, col4, col5 = st.columns(5)
-
-with col1:
-    change_color = "normal" if price_change >= 0 else "inverse"
-    st.metric(
-        "현재가",
-        f"{latest_price:,.0f}원",
-        f"{price_change:+,.0f}원 ({price_change_pct:+.2f}%)"
-    )
-
-with col2:
-    st.metric("기간 최고가", f"{max_price:,.0f}원")
-
-with col3:
-    st.metric("기간 최저가", f"{min_price:,.0f}원")
-
-with col4:
-    st.metric("평균 거래량", f"{avg_volume:,.0f}")
-
-with col5:
-    st.metric("최근 거래량", f"{latest_volume:,.0f}")
-
-st.markdown("---")
+daily_returns = compute_daily_returns(df)
+returns = daily_returns.to_numpy() if len(daily_returns) > 0 else np.array([np.nan])
+
+stats = {
+    'latest_price': latest_price,
+    'price_change': price_change,
+    'price_change_pct': (price_change / previous_price * 100) if previous_price != 0 else 0,
+    'max_price': np.nanmax(arrays['High']),
+    'min_price': np.nanmin(arrays['Low']),
+    'avg_volume': np.nanmean(arrays['Volume']),
+    'latest_volume': arrays['Volume'][-1],
+    'close_mean': np.nanmean(close),
+    'close_std': np.nanstd(close, ddof=1),
+    'ret_mean': np.nanmean(returns),
+    'ret_std': np.nanstd(returns, ddof=1),
+    'ret_max': np.nanmax(returns),
+    'ret_min': np.nanmin(returns),
+    'total_return': (close[-1] / close[0] - 1) * 100,
+}
 
-# 주가 차트
-st.subheader("📈 주가 차트")
+# 긴 기간은 봉을 방향별 트레이스로 묶어 그림 (봉 개수 기준)
+BATCHED_CANDLE_MIN_BARS = 250
+INCREASING_COLOR = '#3D9970'
+DECREASING_COLOR = '#FF4136'
+# 몸통 폭 (x축이 epoch 밀리초이므로 하루의 80%)
+CANDLE_BODY_WIDTH_MS = 0.8 * 86_400_000
+
+def add_batched_candles(fig, df, x_vals, price_range, row=1, col=1):
+    """상승/하락 봉을 방향별 Bar(몸통) + Scatter(꼬리) 트레이스로 묶어 추가"""
+    open_ = df['Open'].to_numpy()
+    high = df['High'].to_numpy()
+    low = df['Low'].to_numpy()
+    close = df['Close'].to_numpy()
+    up = close >= open_
+    
+    for mask, color, label in ((up, INCREASING_COLOR, '상승'), (~up, DECREASING_COLOR, '하락')):
+        x = x_vals[mask]
+        o, h, l, c = open_[mask], high[mask], low[mask], close[mask]
+        
+        # 꼬리: (고가, 저가, NaN) 반복으로 모든 봉을 한 트레이스에 그림
+        wick_y = np.empty(3 * len(x))
+        wick_y[0::3] = h
+        wick_y[1::3] = l
+        wick_y[2::3] = np.nan
+        fig.add_trace(
+            go.Scatter(
+                x=np.repeat(x, 3),
+                y=wick_y,
+                mode='lines',
+                line=dict(color=color, width=1),
+                connectgaps=False,
+                hoverinfo='skip',
+                legendgroup=label,
+                showlegend=False
+            ),
+            row=row, col=col
+        )
+        
+        # 몸통: 시가/종가가 같은 봉도 보이도록 최소 높이 지정
+        fig.add_trace(
+            go.Bar(
+                x=x,
+                y=np.maximum(np.abs(c - o), price_range * 0.002),
+                base=np.minimum(o, c),
+                width=CANDLE_BODY_WIDTH_MS,
+                marker_color=color,
+                marker_line_width=0,
+                name=f"주가 ({label})",
+                legendgroup=label,
+                customdata=np.column_stack([o, h, l, c]),
+                hovertemplate=(
+                    "시가: %{customdata[0]:,.0f}<br>고가: %{customdata[1]:,.0f}<br>"
+                    "저가: %{customdata[2]:,.0f}<br>종가: %{customdata[3]:,.0f}"
+                )
+            ),
+            row=row, col=col
+        )
 
-if chart_type == "캔들스틱":
-    # 캔들스틱 차트
-    fig = make_subplots(
-        rows=2, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.1,
-        subplot_titles=('주가 (캔들스틱)', '거래량'),
-        row_width=[0.7, 0.3]
-    )
-    
-    # 캔들스틱
-    fig.add_trace(
-        go.Candlestick(
-            x=df.index,
-            open=df['Open'],
-            high=df['High'],
-            low=df['Low'],
-            close=df['Close'],
-            name="주가"
-        ),
-        row=1, col=1
-    )
-    
-    # 이동평균선 추가
-    ma_colors = {5: '#FF6B6B', 20: '#4ECDC4', 60: '#45B7D1', 120: '#FFA07A'}
-    for period in ma_periods:
-        if f'MA_{period}' in df.columns:
+# 주가 차트 생성 (같은 데이터·옵션 조합이면 캐시된 Figure 재사용)
+@st.cache_data(ttl=300, show_spinner=False)
+def build_price_figure(df, x_vals, chart_type, ma_periods, show_volume, price_min, price_max):
+    """캔들스틱/라인 주가 차트와 거래량 차트 생성"""
+    if chart_type == "캔들스틱":
+        # 캔들스틱 차트
+        fig = make_subplots(
+            rows=2, cols=1,
+            shared_xaxes=True,
+            vertical_spacing=0.1,
+            subplot_titles=('주가 (캔들스틱)', '거래량'),
+            row_width=[0.7, 0.3]
+        )
+        
+        # 캔들스틱 (긴 기간은 방향별로 묶은 트레이스 사용)
+        if len(df) >= BATCHED_CANDLE_MIN_BARS:
+            add_batched_candles(fig, df, x_vals, price_max - price_min, row=1, col=1)
+            fig.update_layout(barmode='overlay')
+        else:
             fig.add_trace(
-                go.Scatter(
-                    x=df.index,
-                    y=df[f'MA_{period}'],
-                    name=f'{period}일 이동평균',
-                    line=dict(color=ma_colors.get(period, '#999999'), width=2)
+                go.Candlestick(
+                    x=x_vals,
+                    open=df['Open'],
+                    high=df['High'],
+                    low=df['Low'],
+                    close=df['Close'],
+                    name="주가"
                 ),
                 row=1, col=1
             )
-    
-    # 거래량 (Area 차트로 변경)
-    if show_volume:
-        colors = ['rgba(255, 0, 0, 0.3)' if df['Close'].iloc[i] < df['Open'].iloc[i] else 'rgba(0, 255, 0, 0.3)' 
-                 for i in range(len(df))]
+        
+        # 이동평균선 추가
+        ma_colors = {5: '#FF6B6B', 20: '#4ECDC4', 60: '#45B7D1', 120: '#FFA07A'}
+        for period in ma_periods:
+            if f'MA_{period}' in df.columns:
+                ma_x, ma_y = downsample_line(x_vals, df[f'MA_{period}'])
+                fig.add_trace(
+                    go.Scatter(
+                        x=ma_x,
+                        y=ma_y,
+                        name=f'{period}일 이동평균',
+                        line=dict(color=ma_colors.get(period, '#999999'), width=2)
+                    ),
+                    row=1, col=1
+                )
+        
+        # 거래량 (Area 차트로 변경)
+        if show_volume:
+            volume_x, volume_y = downsample_line(x_vals, df['Volume'])
+            fig.add_trace(
+                go.Scatter(
+                    x=volume_x,
+                    y=volume_y,
+                    name="거래량",
+                    fill='tozeroy',
+                    fillcolor='rgba(102, 126, 234, 0.2)',
+                    line=dict(color='rgba(102, 126, 234, 0.8)', width=1),
+                    mode='lines'
+                ),
+                row=2, col=1
+            )
+        
+        # 가격 범위 계산
+        price_range = price_max - price_min
+        # 가격 범위의 약 2% 간격으로 눈금 설정
+        tick_interval = max(price_range * 0.02, 1000)  # 최소 1000원 간격
+        
+        fig.update_layout(
+            height=700,
+            xaxis_rangeslider_visible=False,
+            hovermode='x unified',
+            template='plotly_white'
+        )
+        
+        fig.update_xaxes(type='date')
+        fig.update_xaxes(title_text="날짜", row=2, col=1)
+        fig.update_yaxes(
+            title_text="가격 (원)", 
+            row=1, col=1,
+            tickformat=',.0f',
+            dtick=tick_interval,
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='rgba(128, 128, 128, 0.2)'
+        )
+        fig.update_yaxes(title_text="거래량", row=2, col=1, tickformat=',.0f')
+        
+    else:
+        # 라인 차트
+        fig = make_subplots(
+            rows=2, cols=1,
+            shared_xaxes=True,
+            vertical_spacing=0.1,
+            subplot_titles=('주가 (라인)', '거래량'),
+            row_width=[0.7, 0.3]
+        )
+        
+        # 종가 라인
+        close_x, close_y = downsample_line(x_vals, df['Close'])
         fig.add_trace(
             go.Scatter(
-                x=df.index,
-                y=df['Volume'],
-                name="거래량",
-                fill='tozeroy',
-                fillcolor='rgba(102, 126, 234, 0.2)',
-                line=dict(color='rgba(102, 126, 234, 0.8)', width=1),
-                mode='lines'
+                x=close_x,
+                y=close_y,
+                name="종가",
+                line=dict(color='#1f77b4', width=2)
             ),
-            row=2, col=1
+            row=1, col=1
         )
-    
-    # 가격 범위 계산
-    price_min = df['Low'].min()
-    price_max = df['High'].max()
-    price_range = price_max - price_min
-    # 가격 범위의 약 2% 간격으로 눈금 설정
-    tick_interval = max(price_range * 0.02, 1000)  # 최소 1000원 간격
-    
-    fig.update_layout(
-        height=700,
-        xaxis_rangeslider_visible=False,
-        hovermode='x unified',
-        template='plotly_white'
-    )
-    
-    fig.update_xaxes(title_text="날짜", row=2, col=1)
-    fig.update_yaxes(
-        title_text="가격 (원)", 
-        row=1, col=1,
-        tickformat=',.0f',
-        dtick=tick_interval,
-        showgrid=True,
-        gridwidth=1,
-        gridcolor='rgba(128, 128, 128, 0.2)'
-    )
-    fig.update_yaxes(title_text="거래량", row=2, col=1, tickformat=',.0f')
-    
-else:
-    # 라인 차트
-    fig = make_subplots(
-        rows=2, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.1,
-        subplot_titles=('주가 (라인)', '거래량'),
-        row_width=[0.7, 0.3]
-    )
-    
-    # 종가 라인
-    fig.add_trace(
-        go.Scatter(
-            x=df.index,
-            y=df['Close'],
-            name="종가",
-            line=dict(color='#1f77b4', width=2)
-        ),
-        row=1, col=1
-    )
-    
-    # 이동평균선 추가
-    ma_colors = {5: '#FF6B6B', 20: '#4ECDC4', 60: '#45B7D1', 120: '#FFA07A'}
-    for period in ma_periods:
-        if f'MA_{period}' in df.columns:
+        
+        # 이동평균선 추가
+        ma_colors = {5: '#FF6B6B', 20: '#4ECDC4', 60: '#45B7D1', 120: '#FFA07A'}
+        for period in ma_periods:
+            if f'MA_{period}' in df.columns:
+                ma_x, ma_y = downsample_line(x_vals, df[f'MA_{period}'])
+                fig.add_trace(
+                    go.Scatter(
+                        x=ma_x,
+                        y=ma_y,
+                        name=f'{period}일 이동평균',
+                        line=dict(color=ma_colors.get(period, '#999999'), width=2)
+                    ),
+                    row=1, col=1
+                )
+        
+        # 거래량 (Area 차트로 변경)
+        if show_volume:
+            volume_x, volume_y = downsample_line(x_vals, df['Volume'])
             fig.add_trace(
                 go.Scatter(
-                    x=df.index,
-                    y=df[f'MA_{period}'],
-                    name=f'{period}일 이동평균',
-                    line=dict(color=ma_colors.get(period, '#999999'), width=2)
+                    x=volume_x,
+                    y=volume_y,
+                    name="거래량",
+                    fill='tozeroy',
+                    fillcolor='rgba(102, 126, 234, 0.2)',
+                    line=dict(color='rgba(102, 126, 234, 0.8)', width=1),
+                    mode='lines'
                 ),
-                row=1, col=1
+                row=2, col=1
             )
+        
+        # 가격 범위 계산
+        price_range = price_max - price_min
+        # 가격 범위의 약 2% 간격으로 눈금 설정
+        tick_interval = max(price_range * 0.02, 1000)  # 최소 1000원 간격
+        
+        fig.update_layout(
+            height=700,
+            hovermode='x unified',
+            template='plotly_white'
+        )
+        
+        fig.update_xaxes(type='date')
+        fig.update_xaxes(title_text="날짜", row=2, col=1)
+        fig.update_yaxes(
+            title_text="가격 (원)", 
+            row=1, col=1,
+            tickformat=',.0f',
+            dtick=tick_interval,
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='rgba(128, 128, 128, 0.2)'
+        )
+        fig.update_yaxes(title_text="거래량", row=2, col=1, tickformat=',.0f')
     
-    # 거래량 (Area 차트로 변경)
-    if show_volume:
-        fig.add_trace(
-            go.Scatter(
-                x=df.index,
-                y=df['Volume'],
-                name="거래량",
-                fill='tozeroy',
-                fillcolor='rgba(102, 126, 234, 0.2)',
-                line=dict(color='rgba(102, 126, 234, 0.8)', width=1),
-                mode='lines'
-            ),
-            row=2, col=1
+    return fig
+
+# 메인 대시보드
+# KPI 지표
+def kpi_block(kpi):
+    """현재가, 기간 최고/최저가, 거래량 지표 표시"""
+    st.subheader("📊 주요 지표")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric(
+            "현재가",
+            f"{kpi['latest_price']:,.0f}원",
+            f"{kpi['price_change']:+,.0f}원 ({kpi['price_change_pct']:+.2f}%)"
         )
     
-    # 가격 범위 계산
-    price_min = df['Low'].min()
-    price_max = df['High'].max()
-    price_range = price_max - price_min
-    # 가격 범위의 약 2% 간격으로 눈금 설정
-    tick_interval = max(price_range * 0.02, 1000)  # 최소 1000원 간격
+    with col2:
+        st.metric("기간 최고가", f"{kpi['max_price']:,.0f}원")
     
-    fig.update_layout(
-        height=700,
-        hovermode='x unified',
-        template='plotly_white'
-    )
+    with col3:
+        st.metric("기간 최저가", f"{kpi['min_price']:,.0f}원")
     
-    fig.update_xaxes(title_text="날짜", row=2, col=1)
-    fig.update_yaxes(
-        title_text="가격 (원)", 
-        row=1, col=1,
-        tickformat=',.0f',
-        dtick=tick_interval,
-        showgrid=True,
-        gridwidth=1,
-        gridcolor='rgba(128, 128, 128, 0.2)'
-    )
-    fig.update_yaxes(title_text="거래량", row=2, col=1, tickformat=',.0f')
+    with col4:
+        st.metric("평균 거래량", f"{kpi['avg_volume']:,.0f}")
+    
+    with col5:
+        st.metric("최근 거래량", f"{kpi['latest_volume']:,.0f}")
+
+kpi_block(stats)
 
+st.markdown("---")
+
+# 주가 차트
+st.subheader("📈 주가 차트")
+
+fig = build_price_figure(df, x_vals, chart_type, tuple(ma_periods), show_volume, stats['min_price'], stats['max_price'])
 st.plotly_chart(fig, use_container_width=True)
 
 # 추가 통계 및 분석
@@ -617,8 +821,6 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("#### 일일 수익률 분포")
-    daily_returns = df['Close'].pct_change().dropna() * 100
-    
     fig_returns = go.Figure()
     fig_returns.add_trace(
         go.Histogram(
@@ -629,10 +831,10 @@ with col1:
         )
     )
     fig_returns.add_vline(
-        x=daily_returns.mean(),
+        x=stats['ret_mean'],
         line_dash="dash",
         line_color="red",
-        annotation_text=f"평균: {daily_returns.mean():.2f}%"
+        annotation_text=f"평균: {stats['ret_mean']:.2f}%"
     )
     fig_returns.update_layout(
         title="",
@@ -645,18 +847,12 @@ with col1:
 
 with col2:
     st.markdown("#### 가격 변동성 (볼린저 밴드)")
-    # 볼린저 밴드 계산
-    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-    df['BB_Std'] = df['Close'].rolling(window=20).std()
-    df['BB_Upper'] = df['BB_Middle'] + (df['BB_Std'] * 2)
-    df['BB_Lower'] = df['BB_Middle'] - (df['BB_Std'] * 2)
-    
     fig_bb = go.Figure()
     
     # 볼린저 밴드
     fig_bb.add_trace(
         go.Scatter(
-            x=df.index,
+            x=x_vals,
             y=df['BB_Upper'],
             name="상단 밴드",
             line=dict(color='rgba(255, 0, 0, 0.3)', width=1),
@@ -665,7 +861,7 @@ with col2:
     )
     fig_bb.add_trace(
         go.Scatter(
-            x=df.index,
+            x=x_vals,
             y=df['BB_Lower'],
             name="하단 밴드",
             line=dict(color='rgba(255, 0, 0, 0.3)', width=1),
@@ -676,7 +872,7 @@ with col2:
     )
     fig_bb.add_trace(
         go.Scatter(
-            x=df.index,
+            x=x_vals,
             y=df['BB_Middle'],
             name="중간선 (20일 이동평균)",
             line=dict(color='blue', width=2)
@@ -684,13 +880,14 @@ with col2:
     )
     fig_bb.add_trace(
         go.Scatter(
-            x=df.index,
+            x=x_vals,
             y=df['Close'],
             name="종가",
             line=dict(color='black', width=2)
         )
     )
     
+    fig_bb.update_xaxes(type='date')
     fig_bb.update_layout(
         title="",
         xaxis_title="날짜",
@@ -712,11 +909,11 @@ with col1:
     stats_df = pd.DataFrame({
         '지표': ['평균 종가', '표준편차', '최고가', '최저가', '평균 거래량'],
         '값': [
-            f"{df['Close'].mean():,.0f}원",
-            f"{df['Close'].std():,.0f}원",
-            f"{df['High'].max():,.0f}원",
-            f"{df['Low'].min():,.0f}원",
-            f"{df['Volume'].mean():,.0f}"
+            f"{stats['close_mean']:,.0f}원",
+            f"{stats['close_std']:,.0f}원",
+            f"{stats['max_price']:,.0f}원",
+            f"{stats['min_price']:,.0f}원",
+            f"{stats['avg_volume']:,.0f}"
         ]
     })
     st.dataframe(stats_df, use_container_width=True, hide_index=True)
@@ -726,11 +923,11 @@ with col2:
     returns_stats = pd.DataFrame({
         '지표': ['평균 일일 수익률', '수익률 표준편차', '최대 상승률', '최대 하락률', '총 수익률'],
         '값': [
-            f"{daily_returns.mean():.2f}%",
-            f"{daily_returns.std():.2f}%",
-            f"{daily_returns.max():.2f}%",
-            f"{daily_returns.min():.2f}%",
-            f"{((df['Close'].iloc[-1] / df['Close'].iloc[0] - 1) * 100):.2f}%"
+            f"{stats['ret_mean']:.2f}%",
+            f"{stats['ret_std']:.2f}%",
+            f"{stats['ret_max']:.2f}%",
+            f"{stats['ret_min']:.2f}%",
+            f"{stats['total_return']:.2f}%"
         ]
     })
     st.dataframe(returns_stats, use_container_width=True, hide_index=True)
@@ -741,8 +938,8 @@ st.subheader("📋 주가 데이터")
 
 show_data = st.checkbox("데이터 테이블 보기")
 if show_data:
-    # 한글 컬럼명으로 변환
-    display_df = df.copy()
+    # 표와 CSV에는 선택 여부와 관계없이 모든 이동평균 포함
+    table_df = build_table_frame(df)
     
     # 컬럼명 매핑 딕셔너리
     column_mapping = {
@@ -763,10 +960,11 @@ if show_data:
         'BB_Lower': '볼린저 밴드 하단'
     }
     
-    # 존재하는 컬럼만 매핑
-    display_df = display_df.rename(columns={col: column_mapping[col] 
-                                            for col in display_df.columns 
-                                            if col in column_mapping})
+    # 존재하는 컬럼만 한글 컬럼명으로 변환 (데이터 복사 없이)
+    display_df = table_df.rename(columns={col: column_mapping[col]
+                                          for col in table_df.columns
+                                          if col in column_mapping},
+                                 **RENAME_NO_COPY)
     
     st.dataframe(
         display_df,
@@ -775,7 +973,7 @@ if show_data:
     )
     
     # 데이터 다운로드 버튼
-    csv = df.to_csv().encode('utf-8-sig')
+    csv = to_csv_bytes(table_df)
     st.download_button(
         label="📥 주가 데이터 CSV 다운로드",
         data=csv,